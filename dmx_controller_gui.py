@@ -2,15 +2,26 @@ import serial
 import serial.tools.list_ports
 import time
 import os
+import array
+import multiprocessing
+import queue
+import struct
 import threading
-import random
 import math
+import numpy as np
 import tkinter as tk
+from multiprocessing import shared_memory
 from tkinter import ttk, messagebox, simpledialog
 
 # ============== 💡 DMX Configuration Constants ==================
 DMX_BAUD_RATE = 250000 # Standard DMX baud rate (250kbps)
 CHANNELS_PER_LIGHT = 8 # Each light reserves 8 channels
+MAX_LIGHTS = 512 // CHANNELS_PER_LIGHT # Lights that fit the DMX512 universe
+
+# Set DMX_PROCESS_SENDER=1 in the environment to run the serial sender in a
+# separate process with the frame in shared memory (no GIL interaction with
+# the UI/effects process); the default is the in-process sender thread.
+DMX_PROCESS_SENDER = os.environ.get('DMX_PROCESS_SENDER', '0') == '1'
 
 # Channel maps definition based on the light type within the 8-channel block
 CHANNEL_MAPS = {
@@ -19,8 +30,71 @@ CHANNEL_MAPS = {
     # Type B: Based on the user's original CH_MAP (Red on Ch 5)
     'B': {'dimmer': 1, 'red': 5, 'green': 6, 'blue': 7, 'white': 8, 'strobe': 2, 'mode': 3, 'speed': 4}
 }
+
+# Sine lookup table resolution (one full wave = SIN_TABLE_SIZE steps)
+SIN_TABLE_SIZE = 1024
+SIN_TABLE_MASK = SIN_TABLE_SIZE - 1
+SIN_PHASE_SCALE = SIN_TABLE_SIZE / (2 * math.pi)  # radians -> table index
 # =======================================================
 
+# Single C-level byte store for scalar channel writes
+_pack_u8 = struct.Struct('B').pack_into
+# Little-endian 64-bit store for packed per-light channel blocks
+_pack_u64 = struct.Struct('<Q').pack_into
+
+
+def _dmx_sender_process(port, baud_rate, shm_name, stop_event):
+    """Child process: streams the shared-memory DMX frame to the serial port.
+
+    Runs the same break/MAB/write sequence as the sender thread, paced at
+    ~40 Hz with duplicate-frame suppression and a ~1 s keepalive. The parent
+    process only mutates the shared frame, so UI/effect compute and serial
+    I/O never contend for the same interpreter.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        ser = serial.Serial(port, baud_rate, bytesize=8, stopbits=2, timeout=0.1)
+    except serial.SerialException as e:
+        print(f"❌ Sender process could not open {port}: {e}")
+        shm.close()
+        return
+
+    last_sent = b''
+    last_send_time = 0.0
+    next_frame = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            data = bytes(shm.buf[:513])
+            now = time.monotonic()
+            if data != last_sent or now - last_send_time >= 1.0:
+                ser.sendBreak(duration=0.0001) # Break (100us min)
+                time.sleep(0.000016) # Mark-After-Break (16us min)
+                ser.write(data)
+                last_sent = data
+                last_send_time = now
+
+            next_frame += 0.025 # ~40 FPS
+            now = time.monotonic()
+            if next_frame < now - 0.1:
+                next_frame = now # Resync after a stall
+            time.sleep(max(0.0, next_frame - now))
+
+        # Final flush: the stop event can arrive between samples, right
+        # after the parent stored its shutdown blackout frame. Transmit the
+        # current frame once more so that last state reaches the rig, like
+        # the thread sender whose sentinel queues behind the final frame.
+        ser.sendBreak(duration=0.0001)
+        time.sleep(0.000016)
+        ser.write(bytes(shm.buf[:513]))
+    except Exception as e:
+        print(f"Error sending DMX data: {e}. Sender process exiting.")
+    finally:
+        try:
+            ser.close()
+        except Exception:
+            pass
+        shm.close()
+
 
 class DMXController:
     """Manages the DMX serial connection and data."""
@@ -29,40 +103,141 @@ class DMXController:
         self.port = port
         self.baud_rate = baud_rate
         self.ser = None
-        self.dmx_data = bytearray([0] * 513) # DMX512 universe
+        self.dmx_data = np.zeros(513, dtype=np.uint8) # DMX512 universe
+        self._frame_mv = memoryview(self.dmx_data) # For struct-based scalar writes
         self.connected = False
-        
+        # One-slot queue feeding the sender thread; frames are dropped rather
+        # than queued up when the port is slower than the animation loop.
+        self._send_queue = queue.Queue(maxsize=1)
+        self._sender_thread = None
+        # Duplicate-frame suppression: static modes produce identical frames
+        # at 40 Hz, which only need an occasional keepalive refresh
+        self._last_sent = np.zeros(513, dtype=np.uint8)
+        self._last_send_time = 0.0
+        # Shared-memory sender process (opt-in via DMX_PROCESS_SENDER=1)
+        self._shm = None
+        self._sender_process = None
+        self._stop_event = None
+
         if not self.port:
             print("❌ DMX Port not selected.")
             return
 
+        if DMX_PROCESS_SENDER:
+            self._start_process_sender()
+            return
+
         try:
             # Initialize serial connection
             self.ser = serial.Serial(self.port, self.baud_rate, bytesize=8, stopbits=2, timeout=0.1)
             self.connected = True
             print(f"✅ Connected to DMX port: {self.port}")
+            self._sender_thread = threading.Thread(target=self._sender_loop, daemon=True)
+            self._sender_thread.start()
         except serial.SerialException as e:
             print(f"❌ Error connecting to DMX port {self.port}: {e}")
             self.connected = False
 
+    def _start_process_sender(self):
+        """Back the frame with shared memory and stream it from a child process."""
+        try:
+            # Probe the port here so connection status is reported up front;
+            # the child process opens it for real
+            probe = serial.Serial(self.port, self.baud_rate, bytesize=8, stopbits=2, timeout=0.1)
+            probe.close()
+        except serial.SerialException as e:
+            print(f"❌ Error connecting to DMX port {self.port}: {e}")
+            self.connected = False
+            return
+
+        self._shm = shared_memory.SharedMemory(create=True, size=513)
+        self.dmx_data = np.ndarray((513,), dtype=np.uint8, buffer=self._shm.buf)
+        self.dmx_data[:] = 0
+        self._frame_mv = memoryview(self.dmx_data)
+        self._stop_event = multiprocessing.Event()
+        self._sender_process = multiprocessing.Process(
+            target=_dmx_sender_process,
+            args=(self.port, self.baud_rate, self._shm.name, self._stop_event),
+            daemon=True)
+        self._sender_process.start()
+        self.connected = True
+        print(f"✅ Connected to DMX port: {self.port} (process sender)")
+
     def set_channel(self, channel, value):
-        """Sets a specific DMX channel with a value (0-255)."""
-        if 1 <= channel <= 512:
-            self.dmx_data[channel] = int(max(0, min(255, value)))
-            
+        """Sets a specific DMX channel with a value (0-255).
+
+        Validating version for manual/GUI callers where channel and value
+        may come from user input.
+        """
+        if 0 < channel < 513:
+            v = int(value)
+            _pack_u8(self._frame_mv, channel, v if 0 <= v <= 255 else (0 if v < 0 else 255))
+
     def send_data(self):
-        """Sends the DMX data packet."""
+        """Hands a snapshot of the DMX frame to the sender thread.
+
+        sendBreak/write block on kernel I/O; doing them on a worker thread
+        lets the Tk thread compute the next frame while the current one is
+        still on the wire.
+        """
+        if self._sender_process is not None:
+            return # Process sender streams the shared frame on its own clock
         if self.connected and self.ser and self.ser.is_open:
+            now = time.monotonic()
+            if (now - self._last_send_time < 1.0
+                    and np.array_equal(self.dmx_data, self._last_sent)):
+                return # Unchanged frame; receivers get a keepalive every ~1 s
+            try:
+                self._send_queue.put_nowait(self.dmx_data.tobytes())
+            except queue.Full:
+                return # Sender still busy with the previous frame; drop this one
+            np.copyto(self._last_sent, self.dmx_data)
+            self._last_send_time = now
+
+    def _sender_loop(self):
+        """Worker thread: pulls frame snapshots and pushes them to the port."""
+        while True:
+            data = self._send_queue.get()
+            if data is None: # Shutdown sentinel
+                break
             try:
                 # DMX packet must start with a break, MAB, and start code (0x00)
                 self.ser.sendBreak(duration=0.0001) # Break (100us min)
                 time.sleep(0.000016) # Mark-After-Break (16us min)
-                self.ser.write(self.dmx_data)
+                self.ser.write(data)
             except Exception as e:
                 # Handle cases where the port disconnects mid-send
                 print(f"Error sending DMX data: {e}. Disconnecting.")
                 self.connected = False
                 self.ser.close()
+                break
+
+    def close(self):
+        """Stop the sender (thread or process) and close the serial port."""
+        if self._sender_process is not None:
+            self._stop_event.set()
+            self._sender_process.join(timeout=1.0)
+            self._sender_process = None
+            # Detach the frame from the shared block before releasing it
+            self._frame_mv.release()
+            self.dmx_data = self.dmx_data.copy()
+            self._frame_mv = memoryview(self.dmx_data)
+            try:
+                self._shm.close()
+                self._shm.unlink()
+            except (BufferError, FileNotFoundError):
+                pass
+            self._shm = None
+        if self._sender_thread is not None and self._sender_thread.is_alive():
+            try:
+                self._send_queue.put(None, timeout=0.5)
+            except queue.Full:
+                pass
+            self._sender_thread.join(timeout=1.0)
+        self._sender_thread = None
+        self.connected = False
+        if self.ser and self.ser.is_open:
+            self.ser.close()
 
 
 class LightEffect:
@@ -73,6 +248,82 @@ class LightEffect:
         self.light_configs = light_configs # Reference to the list of light configurations
         self.brightness = 128
         self.time_counter = 0
+        # Dirty-flag caches: gated effects skip rewriting channels on frames
+        # where the gated state did not flip
+        self._last_strobe_on = None
+        self._last_party_step = None
+        self._lightning_flashes = set()
+        self._last_lightning_state = None
+        # NumPy generator for effects that draw many random values per frame
+        self._rng = np.random.default_rng()
+        # Quarter-wave sine table: effects advance time_counter in small integer
+        # steps, so sin() arguments repeat and a lookup beats math.sin per call.
+        # Only the first quadrant is stored; _fast_sin mirrors it for the rest.
+        self._SIN_TABLE = array.array('f', [math.sin(2 * math.pi * i / SIN_TABLE_SIZE)
+                                            for i in range(SIN_TABLE_SIZE // 4 + 1)])
+        self._rebuild_index_tables()
+
+    def _rebuild_index_tables(self):
+        """Resolve light_configs into the (N, 5) DMX channel index table.
+
+        Rows are lights, columns are [dimmer, red, green, blue, white].
+        Must be called again whenever the light count or a channel group
+        changes, so the vectorized effects scatter to the right channels.
+        """
+        n = len(self.light_configs)
+        self._ch_idx = np.empty((n, 5), dtype=np.int32)
+        for i, config in enumerate(self.light_configs):
+            start_channel = config['address']
+            ch_map = self.get_channel_map(config['type'])
+            self._ch_idx[i] = (start_channel + ch_map['dimmer'] - 1,
+                               start_channel + ch_map['red'] - 1,
+                               start_channel + ch_map['green'] - 1,
+                               start_channel + ch_map['blue'] - 1,
+                               start_channel + ch_map['white'] - 1)
+        # Config-time validation: the unchecked per-frame writes rely on
+        # every resolved index landing inside the 513-byte universe
+        if n and not (0 < self._ch_idx.min() and self._ch_idx.max() <= 512):
+            raise ValueError(
+                f"light configuration exceeds the DMX512 universe "
+                f"(max {MAX_LIGHTS} lights at {CHANNELS_PER_LIGHT} channels each)")
+        # Column views used by the vectorized effects
+        self._idx_dim = self._ch_idx[:, 0]
+        self._idx_r = self._ch_idx[:, 1]
+        self._idx_g = self._ch_idx[:, 2]
+        self._idx_b = self._ch_idx[:, 3]
+        self._idx_w = self._ch_idx[:, 4]
+        # Per-light hue offsets spreading the color wheel across all lights
+        self._phase_offset = np.arange(n, dtype=np.float32) * (360.0 / n)
+        # All dimmer/RGBW channels flattened, for whole-rig constant fills
+        self._all_rgbw_idx = self._ch_idx.ravel()
+        # Byte offsets of lights whose dimmer..white channels are contiguous
+        # (Type A): their five bytes can go out as one 64-bit store. The
+        # store covers 8 bytes, so it also needs to fit inside the universe;
+        # the extra three bytes land on the light's own strobe/mode/speed
+        # channels, which the effects leave at zero anyway.
+        self._packed_offset = []
+        for i in range(n):
+            first = int(self._ch_idx[i, 0])
+            contiguous = list(self._ch_idx[i]) == list(range(first, first + 5))
+            self._packed_offset.append(first if contiguous and first + 8 <= 513 else None)
+
+    def _fast_sin(self, phase):
+        """Table-based sin() for a phase given in radians."""
+        idx = int(phase * SIN_PHASE_SCALE) & SIN_TABLE_MASK
+        quadrant = idx >> 8
+        offset = idx & 255
+        if quadrant == 0: return self._SIN_TABLE[offset]
+        if quadrant == 1: return self._SIN_TABLE[256 - offset]
+        if quadrant == 2: return -self._SIN_TABLE[offset]
+        return -self._SIN_TABLE[256 - offset]
+
+    def reset(self):
+        """Reset the animation counter and dirty-flag caches on mode change."""
+        self.time_counter = 0
+        self._last_strobe_on = None
+        self._last_party_step = None
+        self._lightning_flashes = set()
+        self._last_lightning_state = None
 
     def get_channel_map(self, light_type):
         """Returns the channel map (A or B) for a given light type."""
@@ -80,17 +331,16 @@ class LightEffect:
 
     def set_rgbw(self, light_index, r, g, b, w=0, dimmer_value=None):
         """Helper to set RGBW and Dimmer for a specific light index."""
-        config = self.light_configs[light_index]
-        start_channel = config['address']
-        ch_map = self.get_channel_map(config['type'])
-        
         dimmer = dimmer_value if dimmer_value is not None else self.brightness
-
-        self.dmx.set_channel(start_channel + ch_map['dimmer'] - 1, dimmer)
-        self.dmx.set_channel(start_channel + ch_map['red'] - 1, r)
-        self.dmx.set_channel(start_channel + ch_map['green'] - 1, g)
-        self.dmx.set_channel(start_channel + ch_map['blue'] - 1, b)
-        self.dmx.set_channel(start_channel + ch_map['white'] - 1, w)
+        offset = self._packed_offset[light_index]
+        if offset is not None:
+            # Contiguous Type-A block: pack dimmer..white into one 64-bit store
+            _pack_u64(self.dmx._frame_mv, offset,
+                      dimmer | (r << 8) | (g << 16) | (b << 24) | (w << 32))
+        else:
+            # Scattered Type-B layout: one fancy-index store via the row
+            # indexes pre-resolved in _rebuild_index_tables
+            self.dmx.dmx_data[self._ch_idx[light_index]] = (dimmer, r, g, b, w)
 
     # --- Core Helpers ---
     def hsv_to_rgb(self, h, s, v):
@@ -101,122 +351,190 @@ class LightEffect:
         c = v * s
         x = c * (1 - abs((h / 60) % 2 - 1))
         m = v - c
-        
+
         if 0 <= h < 60: r, g, b = c, x, 0
         elif 60 <= h < 120: r, g, b = x, c, 0
         elif 120 <= h < 180: r, g, b = 0, c, x
         elif 180 <= h < 240: r, g, b = 0, x, c
         elif 240 <= h < 300: r, g, b = x, 0, c
         else: r, g, b = c, 0, x
-        
+
         return int((r + m) * 255), int((g + m) * 255), int((b + m) * 255)
 
+    def _hsv_to_rgb_batch(self, h_arr, s, v):
+        """Vectorized hsv_to_rgb: converts an array of hues (shared s/v) at once.
+
+        Uses the sector-index formulation instead of the per-element if-ladder,
+        so one call replaces N Python-level hsv_to_rgb calls per frame.
+        """
+        s = max(0.0, min(1.0, s))
+        v = max(0.0, min(1.0, v))
+        h6 = (h_arr % 360) / 60.0
+        sector = h6.astype(np.int32) % 6
+        f = h6 - np.floor(h6)
+
+        p = np.full_like(f, v * (1 - s))
+        q = v * (1 - s * f)
+        t = v * (1 - s * (1 - f))
+        vv = np.full_like(f, v)
+
+        r = np.choose(sector, [vv, q, p, p, t, vv])
+        g = np.choose(sector, [t, vv, vv, q, p, p])
+        b = np.choose(sector, [p, p, t, vv, vv, q])
+
+        return ((r * 255).astype(np.uint8),
+                (g * 255).astype(np.uint8),
+                (b * 255).astype(np.uint8))
+
     # --- Lighting Modes (Refactored to use dynamic configuration) ---
+    # Each mode takes an optional brightness snapshot so the frame tick can
+    # read the shared attribute once per frame instead of once per light.
 
-    def white_light(self):
+    def white_light(self, brightness=None):
         """Mode 1: Pure white light."""
-        for i in range(len(self.light_configs)):
-            self.set_rgbw(i, 0, 0, 0, w=self.brightness)
-    
-    def color_chase(self):
+        br = self.brightness if brightness is None else brightness
+        dmx_data = self.dmx.dmx_data
+        dmx_data[self._ch_idx[:, 1:4]] = 0 # R/G/B off
+        dmx_data[self._idx_dim] = br
+        dmx_data[self._idx_w] = br
+
+    def color_chase(self, brightness=None):
         """Mode 2: Slow color chase with different colors per light."""
-        for i in range(len(self.light_configs)):
-            # Each light has a different phase offset
-            phase = (self.time_counter + i * (360 // len(self.light_configs))) % 360
-            r, g, b = self.hsv_to_rgb(phase, 1.0, self.brightness / 255.0)
-            self.set_rgbw(i, r, g, b, w=0)
-            
-        self.time_counter += 2 
+        br = self.brightness if brightness is None else brightness
+        # Each light has a different phase offset
+        phases = (self.time_counter + self._phase_offset) % 360
+        r, g, b = self._hsv_to_rgb_batch(phases, 1.0, br / 255.0)
+
+        dmx_data = self.dmx.dmx_data
+        dmx_data[self._idx_dim] = br
+        dmx_data[self._idx_r] = r
+        dmx_data[self._idx_g] = g
+        dmx_data[self._idx_b] = b
+        dmx_data[self._idx_w] = 0
+
+        self.time_counter += 2
     
-    def strobe_effect(self):
-        """Mode 3: Fast strobe effect (White)."""
-        strobe_on = (int(self.time_counter / 2) % 2) == 0
+    def strobe_effect(self, brightness=None):
+        """Mode 3: Fast strobe effect (White). Always full intensity."""
+        strobe_on = ((self.time_counter >> 1) & 1) == 0
+        self.time_counter += 1
+        if strobe_on == self._last_strobe_on:
+            return # State unchanged; keep the previous frame
+        self._last_strobe_on = strobe_on
+
         intensity = 255 if strobe_on else 0
-        
         for i in range(len(self.light_configs)):
             self.set_rgbw(i, 0, 0, 0, w=intensity, dimmer_value=intensity)
-            
-        self.time_counter += 1
     
-    def dance_mode(self):
+    def dance_mode(self, brightness=None):
         """Mode 4: Rhythmic dance-like effect."""
+        br = self.brightness if brightness is None else brightness
         for i in range(len(self.light_configs)):
-            light_beat = math.sin((self.time_counter + i * 30) * 0.25) * 0.5 + 0.5
-            light_intensity = int(light_beat * self.brightness)
-            
+            light_beat = self._fast_sin((self.time_counter + i * 30) * 0.25) * 0.5 + 0.5
+            light_intensity = int(light_beat * br)
+
             # Alternate between warm and cool colors
             if i % 2 == 0:
                 r, g, b = light_intensity, int(light_intensity * 0.7), 0
             else:
                 r, g, b = 0, int(light_intensity * 0.7), light_intensity
-            
-            self.set_rgbw(i, r, g, b, w=0)
-            
+
+            self.set_rgbw(i, r, g, b, w=0, dimmer_value=br)
+
         self.time_counter += 3
     
-    def rainbow_fade(self):
+    def rainbow_fade(self, brightness=None):
         """Mode 5: Smooth rainbow fade across all lights."""
+        br = self.brightness if brightness is None else brightness
         base_hue = (self.time_counter * 2) % 360
-        
-        for i in range(len(self.light_configs)):
-            hue = (base_hue + i * (360 // len(self.light_configs))) % 360
-            r, g, b = self.hsv_to_rgb(hue, 0.8, self.brightness / 255.0)
-            self.set_rgbw(i, r, g, b, w=0)
-            
+        hues = (base_hue + self._phase_offset) % 360
+        r, g, b = self._hsv_to_rgb_batch(hues, 0.8, br / 255.0)
+
+        dmx_data = self.dmx.dmx_data
+        dmx_data[self._idx_dim] = br
+        dmx_data[self._idx_r] = r
+        dmx_data[self._idx_g] = g
+        dmx_data[self._idx_b] = b
+        dmx_data[self._idx_w] = 0
+
         self.time_counter += 1
     
-    def fire_effect(self):
+    def fire_effect(self, brightness=None):
         """Mode 6: Flickering fire effect (Red/Orange)."""
-        for i in range(len(self.light_configs)):
-            flicker = random.uniform(0.6, 1.0)
-            base_intensity = int(self.brightness * flicker)
-            
-            red = base_intensity
-            green = int(base_intensity * random.uniform(0.3, 0.7))
-            blue = int(base_intensity * random.uniform(0.0, 0.2))
-            
-            self.set_rgbw(i, red, green, blue, w=0)
+        br = self.brightness if brightness is None else brightness
+        n = len(self.light_configs)
+        # Draw all flicker values at once instead of 3 random.uniform calls
+        # per light per frame
+        red = (br * self._rng.uniform(0.6, 1.0, n)).astype(np.uint8)
+        green = (red * self._rng.uniform(0.3, 0.7, n)).astype(np.uint8)
+        blue = (red * self._rng.uniform(0.0, 0.2, n)).astype(np.uint8)
+
+        dmx_data = self.dmx.dmx_data
+        dmx_data[self._idx_dim] = br
+        dmx_data[self._idx_r] = red
+        dmx_data[self._idx_g] = green
+        dmx_data[self._idx_b] = blue
+        dmx_data[self._idx_w] = 0
     
-    def ocean_wave(self):
+    def ocean_wave(self, brightness=None):
         """Mode 7: Ocean wave effect with blue and teal colors."""
+        br = self.brightness if brightness is None else brightness
         for i in range(len(self.light_configs)):
-            wave = math.sin((self.time_counter + i * 40) * 0.1) * 0.5 + 0.5
-            intensity = int(wave * self.brightness)
-            
+            wave = self._fast_sin((self.time_counter + i * 40) * 0.1) * 0.5 + 0.5
+            intensity = int(wave * br)
+
             red = 0
             green = int(intensity * 0.6)
             blue = intensity
-            
-            self.set_rgbw(i, red, green, blue, w=0)
-            
+
+            self.set_rgbw(i, red, green, blue, w=0, dimmer_value=br)
+
         self.time_counter += 2
     
-    def party_mode(self):
+    def party_mode(self, brightness=None):
         """Mode 8: Fast random color changes."""
-        if self.time_counter % 5 == 0:
-            for i in range(len(self.light_configs)):
-                r = random.randint(0, self.brightness)
-                g = random.randint(0, self.brightness)
-                b = random.randint(0, self.brightness)
-                self.set_rgbw(i, r, g, b, w=0)
-            
+        br = self.brightness if brightness is None else brightness
+        step = self.time_counter // 5
         self.time_counter += 1
-    
-    def lightning_effect(self):
+        if step != self._last_party_step:
+            self._last_party_step = step
+            n = len(self.light_configs)
+            rgb = self._rng.integers(0, br + 1, size=(n, 3), dtype=np.uint8)
+
+            dmx_data = self.dmx.dmx_data
+            dmx_data[self._idx_dim] = br
+            dmx_data[self._idx_r] = rgb[:, 0]
+            dmx_data[self._idx_g] = rgb[:, 1]
+            dmx_data[self._idx_b] = rgb[:, 2]
+            dmx_data[self._idx_w] = 0
+
+    def lightning_effect(self, brightness=None):
         """Mode 9: Lightning effect with random bright flashes."""
-        ambient = int(self.brightness * 0.1)
-        
-        if random.random() < 0.05: # 5% chance of lightning per frame
+        br = self.brightness if brightness is None else brightness
+        tick = self.time_counter % 40
+        if tick == 0:
+            # Pre-sample the next ~second of flash frames (5% chance each)
+            # so the hot path is a set lookup instead of a per-frame RNG call
+            flashes = np.flatnonzero(self._rng.random(40) < 0.05)
+            self._lightning_flashes = set(flashes.tolist())
+        self.time_counter += 1
+
+        ambient = int(br * 0.1)
+        state = (tick in self._lightning_flashes, ambient)
+        if state == self._last_lightning_state:
+            return # Neither flash state nor ambient level changed
+        self._last_lightning_state = state
+
+        if state[0]:
             for i in range(len(self.light_configs)):
                 self.set_rgbw(i, 255, 255, 255, w=255, dimmer_value=255)
         else:
             for i in range(len(self.light_configs)):
                 self.set_rgbw(i, 0, 0, ambient, w=0, dimmer_value=ambient)
     
-    def turn_off_all(self):
+    def turn_off_all(self, brightness=None):
         """Mode 0: Turn off all lights."""
-        for i in range(len(self.light_configs)):
-            self.set_rgbw(i, 0, 0, 0, w=0, dimmer_value=0)
+        self.dmx.dmx_data[self._all_rgbw_idx] = 0
 
 
 class DMXControllerGUI:
@@ -247,13 +565,14 @@ class DMXControllerGUI:
 
         self.dmx = DMXController(self.selected_port, DMX_BAUD_RATE)
         self.effect = LightEffect(self.dmx, self.light_configs)
-        
+        self._build_mode_dispatch()
+
         self.current_mode = '0'
-        self.is_running = False
-        self.animation_thread = None
-        
+        self._after_id = None
+        self._next_frame = time.monotonic()
+
         self.create_widgets()
-        self.start_animation()
+        self._start_animation()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def setup_styles(self):
@@ -303,7 +622,9 @@ class DMXControllerGUI:
                     'address': self._get_start_address(i)
                 })
         elif new_count < current_count:
-            self.light_configs = self.light_configs[:new_count]
+            # Shrink in place: LightEffect holds a reference to this list,
+            # so rebinding it would leave the effect on the stale configs
+            del self.light_configs[new_count:]
             
         # Ensure all addresses are updated (in case CHANNELS_PER_LIGHT changes, though fixed here)
         for i in range(new_count):
@@ -317,9 +638,11 @@ class DMXControllerGUI:
                                             "ระบุจำนวนไฟพาร์ทั้งหมด (8 Channels ต่อดวง):",
                                             initialvalue=self.num_lights.get(),
                                             minvalue=1,
+                                            maxvalue=MAX_LIGHTS,
                                             parent=self.root)
         if new_count is not None and new_count != self.num_lights.get():
-            self._update_light_configs(new_count) 
+            self._update_light_configs(new_count)
+            self.effect._rebuild_index_tables() # Rebuild vectorized index arrays
             self._update_status_label() # Update display
             self.turn_off_all() # Reset lights
             
@@ -350,6 +673,7 @@ class DMXControllerGUI:
             for i in range(self.num_lights.get()):
                 new_type = type_vars[i].get()
                 self.light_configs[i]['type'] = new_type
+            self.effect._rebuild_index_tables() # Rebuild vectorized index arrays
             dialog.destroy()
             self.turn_off_all() # Reset colors based on new channel map
 
@@ -569,7 +893,7 @@ class DMXControllerGUI:
     def set_mode(self, mode, name):
         """Set lighting mode."""
         self.current_mode = mode
-        self.effect.time_counter = 0 # Reset animation counter
+        self.effect.reset() # Reset animation counter and dirty-flag caches
         self.mode_label.config(text=f"Current Mode: {name}")
     
     def turn_off_all(self):
@@ -581,76 +905,99 @@ class DMXControllerGUI:
     def _reconnect_dmx(self):
         """Close current connection, select new port, and reinitialize DMX."""
         # 1. Stop animation and close connection
-        self.is_running = False
-        if self.dmx.ser and self.dmx.ser.is_open:
-            self.dmx.ser.close()
-        
+        self._stop_animation()
+        self.dmx.close()
+
         # 2. Select new port
         new_port = self._select_dmx_port_dialog()
-        
+
         # 3. Reinitialize DMX object
         if new_port:
             self.dmx = DMXController(new_port, DMX_BAUD_RATE)
             self.effect = LightEffect(self.dmx, self.light_configs)
+            self._build_mode_dispatch() # Dispatch table holds bound methods
             self._update_status_label()
-            self.start_animation() # Restart thread
+            self._start_animation() # Restart frame scheduling
         else:
             self.dmx.connected = False
             self.dmx.port = "NONE"
             self._update_status_label()
-            self.start_animation() # Restart thread (will run but won't send data)
+            self._start_animation() # Restart frame scheduling (will run but won't send data)
+
+    # --- Animation Loop (Tk after-based scheduler) ---
+
+    def _build_mode_dispatch(self):
+        """Map mode keys to effect methods for the frame tick.
+
+        Holds bound methods, so it must be rebuilt whenever self.effect is
+        replaced (e.g. after a DMX reconnect).
+        """
+        self._mode_dispatch = {
+            '0': self.effect.turn_off_all,
+            '1': self.effect.white_light,
+            '2': self.effect.color_chase,
+            '3': self.effect.strobe_effect,
+            '4': self.effect.dance_mode,
+            '5': self.effect.rainbow_fade,
+            '6': self.effect.fire_effect,
+            '7': self.effect.ocean_wave,
+            '8': self.effect.party_mode,
+            '9': self.effect.lightning_effect,
+        }
+
+    def _start_animation(self):
+        """(Re)start the frame scheduler on the Tk event loop."""
+        self._stop_animation()
+        self._next_frame = time.monotonic()
+        self._tick()
+
+    def _stop_animation(self):
+        """Cancel the pending animation frame, if any."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        """Run one animation frame and reschedule against a monotonic deadline.
+
+        Running on the Tk event loop avoids the GIL handoff of a separate
+        animation thread, and deadline scheduling keeps the ~40 FPS frame
+        period from drifting the way a fixed time.sleep does.
+        """
+        try:
+            # Dispatch the current mode; 'manual' is absent from the table
+            # because it is static and needs no per-frame recompute
+            effect_fn = self._mode_dispatch.get(self.current_mode)
+            if effect_fn:
+                # Snapshot brightness once per frame; the Tk slider callback
+                # may rewrite it while the effect is computing
+                effect_fn(self.effect.brightness)
+
+            # Send DMX data (DMXController handles connection check)
+            self.dmx.send_data()
+        except Exception as e:
+            print(f"Animation frame error: {e}")
+
+        self._next_frame += 0.025 # ~40 FPS
+        now = time.monotonic()
+        if self._next_frame < now - 0.1:
+            # Fell badly behind (GC pause, modal dialog); resync the deadline
+            # instead of firing a burst of catch-up frames
+            self._next_frame = now
+        delay = max(0.0, self._next_frame - now)
+        self._after_id = self.root.after(int(delay * 1000), self._tick)
 
-    # --- Threading/Animation Loop ---
-    
-    def start_animation(self):
-        """Start the animation thread if not running."""
-        if not self.is_running:
-            self.is_running = True
-            self.animation_thread = threading.Thread(target=self.animation_loop, daemon=True)
-            self.animation_thread.start()
-    
-    def animation_loop(self):
-        """Main animation loop running in separate thread."""
-        while self.is_running:
-            try:
-                # Only execute effect if not in manual mode (which is static)
-                if self.current_mode != 'manual':
-                    if self.current_mode == '0': self.effect.turn_off_all()
-                    elif self.current_mode == '1': self.effect.white_light()
-                    elif self.current_mode == '2': self.effect.color_chase()
-                    elif self.current_mode == '3': self.effect.strobe_effect()
-                    elif self.current_mode == '4': self.effect.dance_mode()
-                    elif self.current_mode == '5': self.effect.rainbow_fade()
-                    elif self.current_mode == '6': self.effect.fire_effect()
-                    elif self.current_mode == '7': self.effect.ocean_wave()
-                    elif self.current_mode == '8': self.effect.party_mode()
-                    elif self.current_mode == '9': self.effect.lightning_effect()
-                    
-                # Send DMX data (DMXController handles connection check)
-                self.dmx.send_data()
-                time.sleep(0.025) # ~40 FPS
-                
-            except Exception as e:
-                # Critical error in the loop thread
-                print(f"Animation loop error: {e}")
-                time.sleep(1.0)
-    
     def on_closing(self):
         """Handle window closing."""
-        self.is_running = False
-        
+        self._stop_animation()
+
         # Turn off all lights and send final data
         self.effect.turn_off_all()
         self.dmx.send_data()
-        
-        # Close serial connection
-        if self.dmx.ser and self.dmx.ser.is_open:
-            self.dmx.ser.close()
-        
-        # Wait for thread to finish gracefully
-        if self.animation_thread and self.animation_thread.is_alive():
-            self.animation_thread.join(timeout=1.0)
-        
+
+        # Flush the sender thread and close the serial connection
+        self.dmx.close()
+
         self.root.destroy()
 
 def main():